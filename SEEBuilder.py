@@ -5,7 +5,8 @@ pn.extension()
 import os
 import json
 import traceback
-from SEEmeta import material,opposedAnvilCell,anvil
+from SEEmeta import material,opposedAnvilCell,anvil,SEEMetaSaver
+from searchIndex import searchIndex
 from sqlalchemy import create_engine
 
 # ===================== LOAD MATERIALS DATABASE ================
@@ -49,6 +50,7 @@ anvil_culetDiameter = pn.widgets.FloatInput(name="Culet Diameter (mm)")
 anvil_cadFile = pn.widgets.TextInput(name="CAD File (path)", placeholder="optional")
 anvil_manufacturer = pn.widgets.TextInput(name="Manufacturer", placeholder="optional")
 anvil_comment = pn.widgets.TextAreaInput(name="Comment", placeholder="optional")
+anvil_search = pn.widgets.TextInput(name="Search Anvils", placeholder="type to filter, e.g. cbn toroid")
 anvil_file_selector = pn.widgets.Select(name="Load Existing Anvil")
 
 @pn.depends(anvil_type.param.value, watch=True)
@@ -70,22 +72,55 @@ output = pn.pane.JSON(name="Anvil JSON", depth=2, theme="light")
 save_directory = pn.widgets.TextInput(name="Save Directory", 
                                       value="/Users/66j/Documents/ORNL/code/SEEMeta/")
 save_status = pn.pane.Markdown("")
+# content hash of what each JSON preview currently shows
+preview_hashes = {"anvil": None, "oac": None}
+
+# ===================== FILE SEARCH ==========================
+# selectors only ever hold the top matches for what is typed in their search box,
+# so the full catalog is never shipped to the browser.
+# index keys are stringDescriptors (file name without .json), payloads the file names
+max_matches = 20
+anvil_index = searchIndex()
+oac_index = searchIndex()
+
+def rebuild_indices():
+    anvil_index.clear()
+    oac_index.clear()
+    directory = save_directory.value.strip()
+    anvil_dir = os.path.join(directory, "anvils")
+    if os.path.isdir(anvil_dir):
+        for f in os.listdir(anvil_dir):
+            if f.startswith("anvil") and f.endswith(".json"):
+                anvil_index.add(f[:-len(".json")], f)
+    if os.path.isdir(directory):
+        for f in os.listdir(directory):
+            if f.endswith(".json"):
+                oac_index.add(f[:-len(".json")], f)
+
+def show_matches(selector, index, query, keep=None, placeholder=None):
+    # fill a selector with the best matches for query, keeping `keep` (e.g. the current value) listed
+    files = [index.payloads[key] for key in index.search(query, limit=max_matches)]
+    if keep and keep not in files:
+        files = [keep] + files
+    if placeholder:
+        files = [placeholder] + files
+    selector.options = files
 
 def update_anvil_file_selector():
-    directory = os.path.join(save_directory.value.strip(), "anvils")
-    if os.path.isdir(directory):
-        files = [f for f in os.listdir(directory) if f.startswith("anvil") and f.endswith(".json")]
-        anvil_file_selector.options = ["Select a file..."] + files
-        anvil_file_selector.value = "Select a file..."
-    else:
-        anvil_file_selector.options = ["Select a file..."]
-        anvil_file_selector.value = "Select a file..."
+    show_matches(anvil_file_selector, anvil_index, anvil_search.value_input, placeholder="Select a file...")
+    anvil_file_selector.value = "Select a file..."
 
 # Call once at startup
+rebuild_indices()
 update_anvil_file_selector()
 
 @pn.depends(save_directory.param.value, watch=True)
 def _update_anvil_selector_on_dir_change(_):
+    rebuild_indices()
+    update_anvil_file_selector()
+
+@pn.depends(anvil_search.param.value_input, watch=True)
+def _search_anvils(query):
     update_anvil_file_selector()
 
 @pn.depends(
@@ -112,9 +147,13 @@ def update_anvil_output(*_):
             anv.cadFile = anvil_cadFile.value
         anv.manufacturer = anvil_manufacturer.value
         anv.comment = anvil_comment.value
-        output.object = anv.to_dict()
+        # only re-render the preview when the content actually changed
+        if anv.contentHash() != preview_hashes["anvil"]:
+            output.object = anv.to_dict()
+            preview_hashes["anvil"] = anv.contentHash()
     except Exception as e:
         output.object = {"error": str(e)}
+        preview_hashes["anvil"] = None
 
 @pn.depends(anvil_file_selector.param.value, watch=True)
 def load_anvil_from_file(selected_file):
@@ -136,6 +175,7 @@ def load_anvil_from_file(selected_file):
         anvil_manufacturer.value = getattr(anv_obj, "manufacturer", "")
         anvil_comment.value = getattr(anv_obj, "comment", "")
         output.object = anv_obj.to_dict()
+        preview_hashes["anvil"] = anv_obj.contentHash()
         save_status.object = f"✅ Loaded anvil from `{selected_file}`"
     except Exception as e:
         save_status.object = f"❌ Failed to load: {e}"
@@ -145,16 +185,20 @@ save_button = pn.widgets.Button(name="Save Anvil to Disk", button_type="success"
 def save_json(event):
     try:
         if isinstance(output.object, dict) and "error" not in output.object:
-            json_str = json.dumps(output.object, indent=2)
             filename = output.object.get("stringDescriptor", "anvil") + ".json"
             directory = os.path.join(save_directory.value.strip(), "anvils")
             if not directory:
                 raise ValueError("Please specify a save directory.")
             full_path = os.path.join(directory, filename)
             os.makedirs(directory, exist_ok=True)
-            with open(full_path, "w") as f:
-                f.write(json_str)
-            save_status.object = f"✅ Anvil saved to `{full_path}`"
+            if SEEMetaSaver(anvil.from_dict(output.object), full_path, indent=2):
+                save_status.object = f"✅ Anvil saved to `{full_path}`"
+                if filename[:-len(".json")] not in anvil_index:
+                    anvil_index.add(filename[:-len(".json")], filename)
+                    update_anvil_file_selector()
+                    show_matches(anvil_file_oac, anvil_index, anvil_search_oac.value_input, keep=anvil_file_oac.value)
+            else:
+                save_status.object = f"✅ `{full_path}` already up to date"
     except Exception as e:
         save_status.object = f"❌ Save failed: {e}"
 
@@ -171,6 +215,7 @@ anvil_tab = pn.Column(
     anvil_manufacturer,
     anvil_comment,
     save_directory,
+    anvil_search,
     anvil_file_selector,
     save_button,
     save_status,
@@ -221,7 +266,9 @@ loadaxis_oac = pn.widgets.Select(name="Load Axis")
 temp_oac = pn.widgets.Select(name="Temperature Control")
 oac_comment = pn.widgets.TextAreaInput(name="Comment", placeholder="optional")
 oac_manufacturer = pn.widgets.TextInput(name="Manufacturer", placeholder="optional")
+anvil_search_oac = pn.widgets.TextInput(name="Search Anvil JSON", placeholder="type to filter")
 anvil_file_oac = pn.widgets.Select(name="Anvil JSON")
+oac_search = pn.widgets.TextInput(name="Search OpposedAnvilCells", placeholder="type to filter, e.g. vx5 cbn")
 oac_file_selector = pn.widgets.Select(name="Load Existing OpposedAnvilCell")
 oac_output = pn.pane.JSON(name="OAC JSON", depth=2, theme="light")
 save_oac_status = pn.pane.Markdown("")
@@ -242,20 +289,32 @@ def update_oac_fields(tval):
     temp_oac.value = "None"
 
     
-    anvil_dir = os.path.join(save_directory.value.strip(), "anvils")
-    if os.path.isdir(anvil_dir):
-        files = [f for f in os.listdir(anvil_dir) if f.startswith("anvil") and f.endswith(".json")]
-        anvil_file_oac.options = files
-        default_file = def_anvil_map.get(tval)
-        anvil_file_oac.value = default_file if default_file in files else (files[0] if files else None)
-    else:
-        anvil_file_oac.options = []
-        anvil_file_oac.value = None
-
-    oac_files = [f for f in os.listdir(save_directory.value.strip()) if f.endswith(".json")]
-    oac_file_selector.options = ["Select a file..."] + oac_files
+    default_file = def_anvil_map.get(tval)
+    if default_file[:-len(".json")] not in anvil_index:
+        default_file = None
+    show_matches(anvil_file_oac, anvil_index, anvil_search_oac.value_input, keep=default_file)
+    anvil_file_oac.value = default_file or (anvil_file_oac.options[0] if anvil_file_oac.options else None)
+
+    update_oac_file_selector()
+
+def update_oac_file_selector():
+    show_matches(oac_file_selector, oac_index, oac_search.value_input, placeholder="Select a file...")
     oac_file_selector.value = "Select a file..."
 
+@pn.depends(anvil_search_oac.param.value_input, watch=True)
+def _search_anvils_oac(query):
+    show_matches(anvil_file_oac, anvil_index, query, keep=anvil_file_oac.value)
+
+@pn.depends(oac_search.param.value_input, watch=True)
+def _search_oacs(query):
+    update_oac_file_selector()
+
+@pn.depends(save_directory.param.value, watch=True)
+def _update_oac_selectors_on_dir_change(_):
+    # indices are rebuilt by the anvil tab's watcher
+    show_matches(anvil_file_oac, anvil_index, anvil_search_oac.value_input, keep=anvil_file_oac.value)
+    update_oac_file_selector()
+
 
 
 @pn.depends(
@@ -276,6 +335,7 @@ def update_oac_output(*_):
         if not anvil_file_oac.value or anvil_file_oac.value == "Select a file...":
             oac_output.object = None
             oac_preview.object = {"error": "No anvil JSON selected."}
+            preview_hashes["oac"] = None
             return
 
         # Load the anvil object from JSON
@@ -301,13 +361,17 @@ def update_oac_output(*_):
 
         # Assign the full object for saving
         oac_output.object = oac
-        oac_preview.object = oac.to_dict()
+        # only re-render the preview when the content actually changed
+        if oac.contentHash() != preview_hashes["oac"]:
+            oac_preview.object = oac.to_dict()
+            preview_hashes["oac"] = oac.contentHash()
 
     except Exception as e:
         print("OAC preview error:", e)
         traceback.print_exc()
         oac_output.object = None
         oac_preview.object = {"error": str(e)}
+        preview_hashes["oac"] = None
 
 #preview of json
 oac_preview = pn.pane.JSON(name="OAC JSON Preview", depth=2, theme="light")
@@ -332,7 +396,8 @@ def populate_oac_fields_from_obj(oac_obj):
     # (Assumes the anvil JSON file exists and matches stringDescriptor)
     anvil_dir = os.path.join(save_directory.value.strip(), "anvils")
     anvil_json_name = f"{oac_obj.anvils[0].stringDescriptor}.json"
-    if anvil_json_name in anvil_file_oac.options:
+    if oac_obj.anvils[0].stringDescriptor in anvil_index:
+        show_matches(anvil_file_oac, anvil_index, anvil_search_oac.value_input, keep=anvil_json_name)
         anvil_file_oac.value = anvil_json_name
 
 @pn.depends(oac_file_selector.param.value, watch=True)
@@ -350,6 +415,7 @@ def load_oac_from_file(selected_file):
         # Update preview/output
         oac_output.object = oac_obj
         oac_preview.object = oac_obj.to_dict()
+        preview_hashes["oac"] = oac_obj.contentHash()
         save_oac_status.object = f"✅ Loaded OAC from `{selected_file}`"
     except Exception as e:
         save_oac_status.object = f"❌ Failed to load: {e}"
@@ -365,7 +431,6 @@ def save_oac(event):
         if not hasattr(oac_obj, "stringDescriptor"):
             raise ValueError("OAC object is missing a `stringDescriptor` attribute.")
 
-        json_data = json.dumps(oac_obj.to_dict(), indent=2)
         filename = f"{oac_obj.stringDescriptor}.json"
 
         directory = save_directory.value.strip()
@@ -375,10 +440,13 @@ def save_oac(event):
         os.makedirs(directory, exist_ok=True)
         full_path = os.path.join(directory, filename)
 
-        with open(full_path, "w") as f:
-            f.write(json_data)
-
-        save_oac_status.object = f"✅ OAC saved to `{full_path}`"
+        if SEEMetaSaver(oac_obj, full_path, indent=2):
+            save_oac_status.object = f"✅ OAC saved to `{full_path}`"
+            if oac_obj.stringDescriptor not in oac_index:
+                oac_index.add(oac_obj.stringDescriptor, filename)
+                update_oac_file_selector()
+        else:
+            save_oac_status.object = f"✅ `{full_path}` already up to date"
     except Exception as e:
         save_oac_status.object = f"❌ Save failed: {e}"
 
@@ -398,7 +466,9 @@ oac_tab = pn.Column(
     oac_comment,
     oac_manufacturer,
     save_directory,
+    anvil_search_oac,
     anvil_file_oac,
+    oac_search,
     oac_file_selector,
     save_oac_button,
     save_oac_status,  # <== required for feedback
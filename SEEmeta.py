@@ -1,20 +1,128 @@
 # SEE metadata
 import json
 import os
+import hashlib
 from sqlalchemy import create_engine, text
 import re
-
-class anvil:
+import numpy as np
+
+#spectra rows store the absolute path used when they were registered, fall back
+#to the bundled spectra folder when that path does not exist on this machine
+spectraDirectory = os.path.join(os.path.dirname(os.path.abspath(__file__)), "materials", "spectra")
+
+# bump when the SEE dictionaries or their validation rules change, so old stamps stop being trusted
+SEESchemaVersion = 2
+
+def contentHash(data):
+    #canonical content hash of a SEE dictionary: key order, whitespace and any validation stamp do not matter
+    if "validationStamp" in data:
+        data = {key: value for key, value in data.items() if key != "validationStamp"}
+    canonical = json.dumps(data, sort_keys=True, separators=(",",":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+# validation stamps are the last key of a saved SEE object; the digest is the sha256 of the file's
+# bytes with the digest itself replaced by zeros, so it is checked on raw bytes without re-serializing.
+# the indent is recorded too, so a dictionary loaded from the file can be re-serialized and checked
+_stampDigestPlaceholder = "0" * 64
+_stampPattern = re.compile(rb'"validationStamp":\s*\{\s*"schemaVersion":\s*(\d+),\s*"indent":\s*(?:null|\d+),'
+                           rb'\s*"digest":\s*"([0-9a-f]{64})"\s*\}')
+
+def stampBytes(jsonString):
+    #fill in the digest of a JSON string serialized with a placeholder validation stamp
+    raw = jsonString.encode("utf-8")
+    digest = hashlib.sha256(raw).hexdigest()
+    position = jsonString.rindex(_stampDigestPlaceholder)
+    return jsonString[:position] + digest + jsonString[position + len(_stampDigestPlaceholder):]
+
+def stampValid(raw):
+    #True if the raw bytes of a saved SEE object carry an intact stamp for the current schema
+    position = raw.rfind(b'"validationStamp"')
+    if position < 0:
+        return False
+    match = _stampPattern.match(raw, position)
+    if match is None or int(match.group(1)) != SEESchemaVersion:
+        return False
+    start, end = match.span(2)
+    unstamped = raw[:start] + _stampDigestPlaceholder.encode("ascii") + raw[end:]
+    return hashlib.sha256(unstamped).hexdigest() == match.group(2).decode("ascii")
+
+def dictStampValid(data):
+    #True if a dictionary loaded from a saved SEE object carries an intact stamp for the current schema
+    #(re-serializes the dictionary, so prefer stampValid when the raw bytes are at hand)
+    stamp = data.get("validationStamp")
+    if not isinstance(stamp, dict) or stamp.get("schemaVersion") != SEESchemaVersion:
+        return False
+    unstamped = dict(data)
+    unstamped["validationStamp"] = dict(stamp, digest=_stampDigestPlaceholder)
+    try:
+        raw = json.dumps(unstamped, indent=stamp.get("indent")).encode("utf-8")
+    except (TypeError, ValueError):
+        return False
+    return hashlib.sha256(raw).hexdigest() == stamp.get("digest")
+
+def _snapshot(value):
+    #copy of a to_dict() result down to its lists, so later in-place edits of the object show up as differences
+    if isinstance(value, dict):
+        return {key: _snapshot(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_snapshot(item) for item in value]
+    return value
+
+def _identical(a, b):
+    #type-strict equality of two to_dict() results: 1 == 1.0 == True, but they serialize differently
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_identical(value, b[key]) for key, value in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(map(_identical, a, b))
+    return a == b
+
+class SEEobject:
+    #shared base for SEE components (anvil, cylinder, opposedAnvilCell).
+    #keeps the content hash and serialized forms cached together with a copy of the to_dict() they
+    #were built from; any change (including nested anvils and in-place list edits) rebuilds them.
+
+    def _cached(self, key, build):
+        data = self.to_dict()
+        cache = self.__dict__.get("_cache")
+        if cache is None or not _identical(cache["data"], data):
+            cache = {"data": _snapshot(data)}
+            self._cache = cache
+        if key not in cache:
+            cache[key] = build(data)
+        return cache[key]
+
+    def contentHash(self):
+        return self._cached("hash", contentHash)
+
+    def toJSON(self, indent=None):
+        #serialized form with a validation stamp (see stampValid), cached per indent.
+        #the object is fully validated first, so only content that passed validate() is ever stamped
+        def build(data):
+            self.validate()
+            data = dict(data)
+            data["validationStamp"] = {"schemaVersion": SEESchemaVersion, "indent": indent,
+                                       "digest": _stampDigestPlaceholder}
+            return stampBytes(json.dumps(data, indent=indent))
+        return self._cached(("json", indent), build)
+
+    def isDirty(self, filePath):
+        #True if filePath does not hold the current content of this object
+        return fileContentHash(filePath) != self.contentHash()
+
+class anvil(SEEobject):
     #class to define a generic anvil
 
-    def __init__(self,type,material,culetGeometry,culetDiameter,model):
+    def __init__(self,type,material,culetGeometry,culetDiameter,model,skipValidation=False):
 
         self.units="mm"
         self.type = type
         self.material = material
         self.culetGeometry = culetGeometry
         self.culetDiameter = culetDiameter
-        self.validate()
+        if not skipValidation:
+            self.validate()
 
         #optional extra info
         self.model = model
@@ -60,15 +168,22 @@ class anvil:
         return stringDescriptor.replace(" ","_")
 
     @classmethod
-    def from_dict(cls, data):
+    def from_dict(cls, data, trusted=False):
         #instantiate class from data dictionary
+        #trusted=True skips validation if data carries an intact stamp (see dictStampValid)
+        return cls._build(data, trusted and dictStampValid(data))
+
+    @classmethod
+    def _build(cls, data, skipValidation):
+        #skipValidation=True skips every check: only for data whose raw bytes were verified (SEEObjectLoader, SEECatalog)
 
         obj = cls(
             type=data["type"],
             material=data["material"],
             culetGeometry=data["culetGeometry"],
             culetDiameter=data["culetDiameter"],
-            model=data["model"]
+            model=data["model"],
+            skipValidation=skipValidation
         )
         obj.cadFile = data.get("cadFile", "") 
         obj.manufacturer = data.get("manufacturer", "")
@@ -76,7 +191,7 @@ class anvil:
         obj.UB = data.get("UB", [])
         return obj
 
-class cylinder:
+class cylinder(SEEobject):
     #class to define a generic cylinder component
 
     def __init__(self,
@@ -87,7 +202,8 @@ class cylinder:
                  OD,
                  height,
                  axis=[0,1,0],
-                 center=[0,0,0]):
+                 center=[0,0,0],
+                 skipValidation=False):
 
         self.units = "mm"
         self.material = material # a material name that may be different from chemical formula
@@ -96,14 +212,15 @@ class cylinder:
         self.OD = OD
         self.massDensity = massDensity
         self.height = height
-        self.center = center
-        self.axis=axis
+        self.center = list(center) # copies, so shared lists (e.g. the default) are never aliased
+        self.axis=list(axis)
 
         self.stringDescriptor = self.buildStringDescriptor()
         self.cadFile = f"{self.stringDescriptor}.cad"
         self.comment=""
 
-        self.validate()
+        if not skipValidation:
+            self.validate()
         self.buildMantidDictionaries()
 
     def validateChemicalFormula(self):
@@ -158,6 +275,7 @@ class cylinder:
             assert len(vector) == 3, f"{vector} must be a 3-element list"
             for element in vector:
                 assert type(element) is float, f"All elements of {vector} must be floats"
+        assert any(element != 0 for element in self.axis), "axis must not be a zero vector"
 
         #explicit control of allowed materials
         assert self.material in ["Al","BeCu","TiAlV","TiZr","SS304","SS316","V","VNb","NiCrAl"]
@@ -181,13 +299,53 @@ class cylinder:
         }
 
 
+    def to_dict(self):
+        return {
+            "material": self.material,
+            "chemicalFormula": self.chemicalFormula,
+            "massDensity": self.massDensity,
+            "ID": self.ID,
+            "OD": self.OD,
+            "height": self.height,
+            "axis": self.axis,
+            "center": self.center,
+            "cadFile": self.cadFile,
+            "stringDescriptor": self.stringDescriptor,
+            "comment": self.comment
+        }
+
+    @classmethod
+    def from_dict(cls, data, trusted=False):
+        #instantiate class from data dictionary
+        #trusted=True skips validation if data carries an intact stamp (see dictStampValid)
+        return cls._build(data, trusted and dictStampValid(data))
+
+    @classmethod
+    def _build(cls, data, skipValidation):
+        #skipValidation=True skips every check: only for data whose raw bytes were verified (SEEObjectLoader, SEECatalog)
+
+        obj = cls(
+            material=data["material"],
+            chemicalFormula=data["chemicalFormula"],
+            massDensity=data["massDensity"],
+            ID=data["ID"],
+            OD=data["OD"],
+            height=data["height"],
+            axis=data.get("axis", [0.0,1.0,0.0]),
+            center=data.get("center", [0.0,0.0,0.0]),
+            skipValidation=skipValidation
+        )
+        obj.cadFile = data.get("cadFile", "")
+        obj.comment = data.get("comment", "")
+        return obj
+
     def buildStringDescriptor(self):
         return f"cyl_{self.material}_{self.ID}mm_{self.height}mm".replace(" ","_")
 
-class opposedAnvilCell:
+class opposedAnvilCell(SEEobject):
     #class to define a generic opposed anvil cell
 
-    def __init__(self,type,model,material,anvils,gasketMaterial,gasketType,loadAxis):
+    def __init__(self,type,model,material,anvils,gasketMaterial,gasketType,loadAxis,skipValidation=False):
 
         self.type = type
         self.model = model
@@ -195,7 +353,7 @@ class opposedAnvilCell:
         self.anvils = anvils
         self.gasketMaterial = gasketMaterial
         self.gasketType = gasketType
-        self.loadAxis = loadAxis
+        self.loadAxis = list(loadAxis) # copy, the builder passes lists shared between cells
 
         self.stringDescriptor = self.buildStringDescriptor()
         self.cadFile = f"{self.stringDescriptor}.cad"
@@ -205,18 +363,19 @@ class opposedAnvilCell:
         self.manufacturer = ""
         self.comment = ""
 
-        self.validate()
+        if not skipValidation:
+            self.validate()
 
     def validate(self):
 
         assert self.type in ["paris-edinburgh","DAC"]
-        if self.type == ["paris-edinburgh"]:
+        if self.type == "paris-edinburgh":
             assert self.model in ["VX1","VX3","VX5"]
-        elif self.type == ["DAC"]:
+        elif self.type == "DAC":
             assert self.model in ["LEGACY","MARK-VI","MARK-VII"]
 
         # assert self.material in [""] # not sure what these are
-        if self.temperatureControl is not None:
+        if self.temperatureControl not in (None, ""): # from_dict leaves "" when it is not given
             assert self.temperatureControl in ["CCR-14",
                                                "CCR-21",
                                                "CCR-25",
@@ -224,6 +383,10 @@ class opposedAnvilCell:
                                                "PE-CRYO",
                                                "None"] 
         assert len(self.anvils) == 2 #make sure there are two anvils!
+        for anv in self.anvils:
+            anv.validate()
+        assert len(self.loadAxis) == 3, "loadAxis must be a 3-element list"
+        assert any(element != 0 for element in self.loadAxis), "loadAxis must not be a zero vector"
         assert self.gasketMaterial in ["TiZr","Re","W", "Zr", 
                                        "SS301", 
                                        "pyrophyllite","Al",
@@ -246,10 +409,16 @@ class opposedAnvilCell:
             "manufacturer": self.manufacturer,
             "comment": self.comment
         }
-    
+
     @classmethod
-    def from_dict(cls, data):
-        anvils = [anvil.from_dict(a) for a in data["anvils"]]
+    def from_dict(cls, data, trusted=False):
+        #trusted=True skips validation of the cell and its anvils if data carries an intact stamp (see dictStampValid)
+        return cls._build(data, trusted and dictStampValid(data))
+
+    @classmethod
+    def _build(cls, data, skipValidation):
+        #skipValidation=True skips every check: only for data whose raw bytes were verified (SEEObjectLoader, SEECatalog)
+        anvils = [anvil._build(a, skipValidation) for a in data["anvils"]]
         obj = cls(
             type=data["type"],
             model=data["model"],
@@ -257,7 +426,8 @@ class opposedAnvilCell:
             anvils=anvils,
             gasketMaterial=data["gasketMaterial"],
             gasketType=data["gasketType"],
-            loadAxis=data["loadAxis"]
+            loadAxis=data["loadAxis"],
+            skipValidation=skipValidation
         )
         obj.temperatureControl = data.get("temperatureControl", "")
         obj.cadFile = data.get("cadFile", "")
@@ -308,13 +478,253 @@ def SEEMetaLoader(filePath):
 
     return data
 
-def SEEMetaSaver(dict,filePath):
-    #save SEEMeta dictionary to file.
+# on-disk hashes and stamp verdicts keyed by path, reused while the file's mtime and size are unchanged
+_fileHashes = {}
+_fileStamps = {}
+
+def _fileState(filePath):
+    #(content hash, has a valid current stamp) of a SEEMeta json file; (None, False) if missing or unparseable
+
+    try:
+        stat = os.stat(filePath)
+    except FileNotFoundError:
+        return None, False
+
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _fileHashes.get(filePath)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(filePath, "rb") as f:
+        raw = f.read()
+    try:
+        state = (contentHash(json.loads(raw)), stampValid(raw))
+    except ValueError:
+        state = (None, False)
+    _fileHashes[filePath] = (key, state)
+    _fileStamps[filePath] = (key, state[1])
+    return state
+
+def fileContentHash(filePath):
+    #content hash of a SEEMeta json file, or None if it does not exist or cannot be parsed
+    return _fileState(filePath)[0]
+
+def SEEObjectLoader(filePath, trusted=False):
+    #load a SEEMeta json file as an anvil/opposedAnvilCell/cylinder object.
+    #trusted=True skips validation when the file carries an intact stamp for the current schema
+    #(checked on the raw bytes, so it costs one sha256 rather than a re-serialization)
+
+    with open(filePath, "rb") as f:
+        stat = os.fstat(f.fileno())
+        raw = f.read()
+    data = json.loads(raw)
+    if not trusted:
+        return SEEclassFor(data)._build(data, False)
+
+    #the stamp verdict is memoized per file version, so repeated loads skip the sha256
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _fileStamps.get(filePath)
+    if cached is None or cached[0] != key:
+        cached = _fileStamps[filePath] = (key, stampValid(raw))
+    return SEEclassFor(data)._build(data, cached[1])
+
+def SEEMetaSaver(dict,filePath,indent=4):
+    #save SEEMeta dictionary (or SEE object) to file.
+    #the write is skipped if the file already holds the same content (and, for SEE objects, a valid
+    #current stamp, so unstamped or outdated files get stamped); returns True if written
+
+    stamped = isinstance(dict, SEEobject)
+    if stamped:
+        dataHash = dict.contentHash()
+        jsonString = dict.toJSON(indent=indent)
+    else:
+        dataHash = contentHash(dict)
+        jsonString = json.dumps(dict, indent=indent)
 
-    with open(filePath, "w") as f:
-        json.dump(dict, f, indent=4)
+    fileHash, fileStamped = _fileState(filePath)
+    if fileHash == dataHash and (fileStamped or not stamped):
+        print(f"unchanged, skipped: {filePath}")
+        return False
 
+    with open(filePath, "w", newline="") as f: # no newline translation, the stamp digest covers the exact bytes
+        f.write(jsonString)
+
+    stat = os.stat(filePath)
+    _fileHashes[filePath] = ((stat.st_mtime_ns, stat.st_size), (dataHash, stamped))
+    _fileStamps[filePath] = ((stat.st_mtime_ns, stat.st_size), stamped)
     print(f"successfully wrote: {filePath}")
+    return True
+
+def diffSEE(a, b, path=""):
+    #structural diff of two SEE objects (or their dictionaries).
+    #returns {path: (valueInA, valueInB)} for every leaf that differs; identical hashes short-circuit
+
+    if isinstance(a, SEEobject) and isinstance(b, SEEobject):
+        if a.contentHash() == b.contentHash():
+            return {}
+        if type(a) is opposedAnvilCell and type(b) is opposedAnvilCell:
+            #compare nested anvils by hash before descending into them
+            diff = diffSEE({k: v for k, v in a.to_dict().items() if k != "anvils"},
+                           {k: v for k, v in b.to_dict().items() if k != "anvils"}, path)
+            if len(a.anvils) != len(b.anvils):
+                diff[f"{path}anvils"] = (a.to_dict()["anvils"], b.to_dict()["anvils"])
+            else:
+                for i, (anvA, anvB) in enumerate(zip(a.anvils, b.anvils)):
+                    diff.update(diffSEE(anvA, anvB, f"{path}anvils[{i}]."))
+            return diff
+        a, b = a.to_dict(), b.to_dict()
+
+    diff = {}
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in list(a.keys()) + [key for key in b.keys() if key not in a]:
+            if key not in a or key not in b:
+                diff[f"{path}{key}"] = (a.get(key), b.get(key))
+            else:
+                diff.update(diffSEE(a[key], b[key], f"{path}{key}."))
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (itemA, itemB) in enumerate(zip(a, b)):
+            diff.update(diffSEE(itemA, itemB, f"{path.rstrip('.')}[{i}]."))
+    elif a != b:
+        diff[path.rstrip(".")] = (a, b)
+    return diff
+
+def SEEclassFor(data):
+    #work out which SEE class a dictionary describes from its keys
+    if "anvils" in data:
+        return opposedAnvilCell
+    elif "culetGeometry" in data:
+        return anvil
+    elif "OD" in data:
+        return cylinder
+    raise ValueError(f"Cannot tell which SEE class describes {data.get('stringDescriptor', data)}")
+
+def SEECatalogSaver(objects,filePath):
+    #write SEE objects (or their dictionaries) to a JSON Lines catalog, one compact entry per line,
+    #plus a byte-offset index alongside it for random access by stringDescriptor.
+    #every entry is fully validated on the way in, so the whole catalog is stamped as validated in its index.
+    #stringDescriptors must be unique; nothing is written if one repeats
+
+    offsets = {}
+    digest = hashlib.sha256()
+    tmpPath = f"{filePath}.tmp"
+    try:
+        with open(tmpPath, "wb") as f:
+            for obj in objects:
+                if not isinstance(obj, SEEobject):
+                    obj = SEEclassFor(obj)._build(obj, True) # validated just below
+                obj.validate()
+                if obj.stringDescriptor in offsets:
+                    raise ValueError(f"Duplicate stringDescriptor in catalog: {obj.stringDescriptor}")
+                offsets[obj.stringDescriptor] = f.tell()
+                line = json.dumps(obj.to_dict(), separators=(",",":")).encode("utf-8") + b"\n"
+                digest.update(line)
+                f.write(line)
+    except BaseException:
+        os.remove(tmpPath)
+        raise
+    os.replace(tmpPath, filePath)
+
+    _saveCatalogIndex(filePath, offsets, {"schemaVersion": SEESchemaVersion, "digest": digest.hexdigest()})
+    print(f"successfully wrote {len(offsets)} entries to: {filePath}")
+
+def _catalogIndexPath(filePath):
+    return f"{filePath}.idx"
+
+def _saveCatalogIndex(filePath, offsets, stamp=None):
+    #the catalog's size and mtime are stored so a stale index is detected and rebuilt.
+    #stamp (schema version and sha256 of the catalog bytes) is written by SEECatalogSaver and carried
+    #over when a stale index is rebuilt
+    stat = os.stat(filePath)
+    with open(_catalogIndexPath(filePath), "w") as f:
+        json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offsets": offsets,
+                   "validationStamp": stamp}, f)
+
+class SEECatalog:
+    #reader for a JSON Lines catalog written by SEECatalogSaver.
+    #iterating yields anvil/opposedAnvilCell/cylinder objects one at a time in constant memory,
+    #indexing by stringDescriptor seeks straight to that entry without parsing the rest.
+    #trusted=True skips validation of every entry if the catalog's stamp is intact; the stamp is
+    #checked once by hashing the raw file, after which entries load at I/O and json.loads speed.
+
+    def __init__(self,filePath,trusted=False):
+        self.filePath = filePath
+        self.trusted = trusted
+        self._offsets = None
+        self._stamp = None
+        self._verified = None
+
+    def verified(self):
+        #True if the catalog is unchanged since SEECatalogSaver stamped it under the current schema
+        if self._verified is None:
+            self.index()
+            stamp = self._stamp or {}
+            self._verified = False
+            if stamp.get("schemaVersion") == SEESchemaVersion:
+                digest = hashlib.sha256()
+                with open(self.filePath, "rb") as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                self._verified = digest.hexdigest() == stamp.get("digest")
+        return self._verified
+
+    def __iter__(self):
+        with open(self.filePath, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield self._build(line)
+
+    def _build(self, line):
+        data = json.loads(line)
+        return SEEclassFor(data)._build(data, self.trusted and self.verified())
+
+    def index(self):
+        #byte offset of each entry keyed by stringDescriptor, loaded from the index file or rebuilt
+        if self._offsets is not None:
+            return self._offsets
+
+        stat = os.stat(self.filePath)
+        try:
+            with open(_catalogIndexPath(self.filePath), "r") as f:
+                saved = json.load(f)
+            #the stamp is a digest of the content that verified() re-checks, so it is kept even when
+            #only the mtime changed (e.g. a copy without preserved timestamps)
+            self._stamp = saved.get("validationStamp")
+            if saved["size"] == stat.st_size and saved["mtime_ns"] == stat.st_mtime_ns:
+                self._offsets = saved["offsets"]
+                return self._offsets
+        except (FileNotFoundError, ValueError, KeyError, AttributeError):
+            pass
+
+        offsets = {}
+        with open(self.filePath, "rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    offsets[json.loads(line)["stringDescriptor"]] = offset
+                offset += len(line)
+        try:
+            _saveCatalogIndex(self.filePath, offsets, self._stamp)
+        except OSError:
+            pass # read-only catalogs (e.g. shared over NFS) keep the rebuilt index in memory only
+        self._offsets = offsets
+        return self._offsets
+
+    def keys(self):
+        return self.index().keys()
+
+    def __contains__(self, stringDescriptor):
+        return stringDescriptor in self.index()
+
+    def __len__(self):
+        return len(self.index())
+
+    def __getitem__(self, stringDescriptor):
+        offset = self.index().get(stringDescriptor)
+        if offset is None:
+            raise KeyError(f"{stringDescriptor} not found in catalog {self.filePath}")
+        with open(self.filePath, "rb") as f:
+            f.seek(offset)
+            return self._build(f.readline())
 
 def toString(data,compact=True):
     #converts data loaded from file as a dictionary to a string that can be added as a value to a pv
@@ -377,6 +787,29 @@ class material:
 
             return self.spectra
 
+def spectrumFilePath(spectrum):
+    #path of the file holding a spectrum row's data on this machine
+    filePath = spectrum["file_path"]
+    if not os.path.isfile(filePath):
+        filePath = os.path.join(spectraDirectory, os.path.basename(filePath))
+    if not os.path.isfile(filePath):
+        raise FileNotFoundError(f"Spectrum file not found: {spectrum['file_path']}")
+    return filePath
+
+def loadSpectrum(spectrum):
+    #returns (wavelength, values) arrays for a spectrum row as returned by material.get_spectra()
+    #rows that already carry their data (e.g. from a snapshot) are returned without touching disk
+
+    if "wavelength" in spectrum and "values" in spectrum:
+        return spectrum["wavelength"], spectrum["values"]
+
+    assert spectrum["data_format"] == "csv", f"Unsupported spectrum data format: {spectrum['data_format']}"
 
+    filePath = spectrumFilePath(spectrum)
+    data = np.loadtxt(filePath, delimiter=",", skiprows=1, ndmin=2)
+    return data[:, 0].copy(), data[:, 1].copy()
 
-         
\ No newline at end of file
+def gridHash(wavelength):
+    #stable hash of a wavelength grid, used to key cached curves on that grid
+    grid = np.ascontiguousarray(wavelength, dtype="<f8")
+    return hashlib.sha1(grid.tobytes()).hexdigest()
@@ -0,0 +1,169 @@
+# neutron attenuation spectra computed from chemical formula and mass density
+#
+# Uses the bundled table materials/crossSections.csv (bound scattering and 2200 m/s
+# absorption cross-sections of the natural elements plus a few isotopes, from
+# V. F. Sears, Neutron News 3 (1992) 26). Absorption is taken to scale linearly
+# with wavelength, so for a material with N formula units per cm^3:
+#
+#   mu(lambda) = N * sum_i n_i * (sigma_s,i + sigma_a,i * lambda / 1.798) * 1e-24   [1/cm]
+#
+# chemical formulas follow the mantid convention already used by cylinder, e.g.
+# "Zr0.32-Ti0.68", "Al2-Si4-O10-O2-H2" or "(Li7)2-H-D2" for isotopes. Materials
+# without a parseable chemical_formula fall back to composition_by_weight_percent.
+
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+import numpy as np
+from SEEmeta import gridHash
+
+crossSectionFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "materials", "crossSections.csv")
+avogadro = 6.02214076e23
+referenceWavelength = 1.798 # angstrom, wavelength of 2200 m/s neutrons
+
+_formulaTerm = re.compile(r"^(?:\(([A-Z][a-z]?)(\d*)\)|([A-Z][a-z]?))([\d.]*)$")
+# weight compositions in the database are loosely formatted ("Al-0.91", "Ni0.565Cr0.40Al0.035")
+_weightTerm = re.compile(r"([A-Z][a-z]?)\s*-?\s*(\d*\.?\d+)?")
+
+def loadCrossSections(filePath=crossSectionFile):
+    #returns {symbol: (mass_amu, scattering_xs_barn, absorption_xs_barn)}
+    table = {}
+    with open(filePath, "r", newline="") as f:
+        for row in csv.DictReader(f):
+            table[row["symbol"]] = (float(row["mass_amu"]),
+                                    float(row["scattering_xs_barn"]),
+                                    float(row["absorption_xs_barn"]))
+    return table
+
+def parseChemicalFormula(chemicalFormula):
+    #splits a mantid style formula into [(symbol, count)]; isotopes are returned as e.g. "Li7"
+    terms = []
+    for term in chemicalFormula.split("-"):
+        match = _formulaTerm.match(term.strip())
+        if match is None:
+            raise ValueError(f"Cannot parse '{term}' in chemical formula: {chemicalFormula}")
+        element, massNumber, plainElement, count = match.groups()
+        symbol = f"{element}{massNumber}" if element else plainElement
+        terms.append((symbol, float(count) if count else 1.0))
+    return terms
+
+def parseWeightComposition(composition, crossSections):
+    #converts a weight fraction (or percent) composition into [(symbol, relative atom count)]
+    terms = []
+    for symbol, weight in _weightTerm.findall(composition):
+        if symbol not in crossSections:
+            raise ValueError(f"No cross-sections for {symbol} in composition: {composition}")
+        terms.append((symbol, float(weight) / crossSections[symbol][0] if weight else None))
+    if not terms or any(count is None for _, count in terms):
+        raise ValueError(f"Cannot parse composition: {composition}")
+    return terms
+
+class attenuationEngine:
+    #computes linear attenuation curves for materials on arbitrary wavelength grids.
+    #curves are memoized per (material, grid) in an LRU holding at most maxEntries curves.
+
+    def __init__(self, crossSections=None, maxEntries=256):
+        self.crossSections = crossSections if crossSections is not None else loadCrossSections()
+        self.tableHash = hashlib.sha1(json.dumps(sorted(self.crossSections.items())).encode("utf-8")).hexdigest()
+        self.maxEntries = maxEntries
+        self._cache = OrderedDict()
+
+    def coefficients(self, chemicalFormula, massDensity, terms=None):
+        #per-cm scattering and absorption (at 1.798 A) coefficients, so mu = a + b * lambda
+        if terms is None:
+            terms = parseChemicalFormula(chemicalFormula)
+        mass = 0.0
+        scattering = 0.0
+        absorption = 0.0
+        for symbol, count in terms:
+            if symbol not in self.crossSections:
+                raise ValueError(f"No cross-sections for {symbol} in chemical formula: {chemicalFormula}")
+            m, s, a = self.crossSections[symbol]
+            mass += count * m
+            scattering += count * s
+            absorption += count * a
+        numberDensity = massDensity * avogadro / mass # formula units per cm^3
+        return numberDensity * scattering * 1e-24, numberDensity * absorption * 1e-24 / referenceWavelength
+
+    def linearAttenuation(self, chemicalFormula, massDensity, wavelength):
+        #mu in 1/cm evaluated at each wavelength (angstrom)
+        scattering, absorption = self.coefficients(chemicalFormula, massDensity)
+        return scattering + absorption * np.asarray(wavelength, dtype=float)
+
+    def materialCoefficients(self, mat):
+        #coefficients for a material row, from its chemical formula or else its weight composition
+        if not mat.mass_density_g_cm3:
+            raise ValueError(f"No mass density for {mat}")
+        if mat.chemical_formula:
+            try:
+                return self.coefficients(mat.chemical_formula, mat.mass_density_g_cm3)
+            except ValueError:
+                if not mat.composition_by_weight_percent:
+                    raise
+        if mat.composition_by_weight_percent:
+            terms = parseWeightComposition(mat.composition_by_weight_percent, self.crossSections)
+            return self.coefficients(mat.composition_by_weight_percent, mat.mass_density_g_cm3, terms)
+        raise ValueError(f"No chemical formula or composition for {mat}")
+
+    def _key(self, mat, wavelengthHash):
+        return (mat.id, mat.chemical_formula, mat.composition_by_weight_percent,
+                mat.mass_density_g_cm3, wavelengthHash)
+
+    def attenuationAll(self, materials, wavelength):
+        #mu for every material on one grid as an (nMaterials, nWavelength) array.
+        #materials without a usable formula/composition or density get a row of NaN.
+        wavelength = np.asarray(wavelength, dtype=float)
+        wavelengthHash = gridHash(wavelength)
+        result = np.full((len(materials), len(wavelength)), np.nan)
+
+        missing = []
+        coefficients = []
+        for i, mat in enumerate(materials):
+            key = self._key(mat, wavelengthHash)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                result[i] = self._cache[key]
+                continue
+            try:
+                coefficients.append(self.materialCoefficients(mat))
+            except ValueError:
+                continue
+            missing.append(i)
+
+        if missing:
+            scattering, absorption = np.array(coefficients).T
+            result[missing] = scattering[:, None] + absorption[:, None] * wavelength[None, :]
+            for i in missing:
+                curve = result[i].copy()
+                curve.flags.writeable = False
+                self._cache[self._key(materials[i], wavelengthHash)] = curve
+            while len(self._cache) > self.maxEntries:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def attenuationSpectrum(self, mat, wavelength):
+        #computed curve as a spectrum row, usable wherever rows from material.get_spectra() are
+        wavelength = np.asarray(wavelength, dtype=float)
+        values = self.attenuationAll([mat], wavelength)[0]
+        if np.isnan(values).all():
+            self.materialCoefficients(mat) # raises with the reason
+        key = self._key(mat, gridHash(wavelength))
+        return {
+            "identity": f"computed:{self.tableHash}:{json.dumps(key)}",
+            "material_id": mat.id,
+            "spectrum_type": "Attenuation",
+            "data_format": "computed",
+            "file_path": None,
+            "wavelength": wavelength,
+            "values": values
+        }
+
+    def clear(self):
+        self._cache.clear()
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,192 @@
+# batch attenuation contributions for opposed anvil cell runs
+#
+# Each run names an opposedAnvilCell JSON (and optionally a cylinder container).
+# Runs are grouped by the content hash of their configuration so every unique
+# cell is computed once; the unique work is spread over a process pool and the
+# results are kept in a shared on-disk cache, one .npz per configuration.
+#
+# For every configuration the result holds linear attenuation curves in 1/cm on
+# the requested wavelength grid: "anvils" (one row per anvil), "gasket" and, if
+# a container is given, "container" plus its wall transmission
+# "containerTransmission". Anvil and gasket materials are looked up in the
+# materials table; the container curve comes from the cylinder's own
+# chemicalFormula and massDensity, as used for its mantid material. The cell's "loadAxis" is carried along for the
+# geometry dependent part of the correction.
+#
+# The cache key covers everything a result depends on: the cell and container,
+# the grid, the resolved material rows, the cross-section table and
+# resultVersion, so corrected densities or table values are never served stale.
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from sqlalchemy import create_engine
+from SEEmeta import opposedAnvilCell, cylinder, material, contentHash, gridHash, SEEMetaLoader
+from attenuation import attenuationEngine
+
+# SEE material names that differ from the names in the materials table
+materialAliases = {
+    "diamond": "singleCrystalDiamond",
+    "sintered diamond": "sinteredDiamond",
+    "pyrophyllite": "pyrophillite",
+    "CuBe": "BeCu"
+}
+
+# bump whenever computeConfiguration changes what it returns
+resultVersion = 2
+
+# material columns the computed curves depend on
+materialColumns = ("name", "chemical_formula", "composition_by_weight_percent", "mass_density_g_cm3")
+
+# per-process database engines and attenuation engines, reused across configurations
+_workerState = {}
+
+def _workerEngines(dbPath):
+    if dbPath not in _workerState:
+        _workerState[dbPath] = (create_engine(f"sqlite:///{os.path.abspath(dbPath)}"), attenuationEngine())
+    return _workerState[dbPath]
+
+def resolveMaterial(db_engine, name):
+    #look up a SEE material name in the materials table
+    return material(db_engine, name=materialAliases.get(name, name))
+
+def configurationMaterials(seeDict):
+    #SEE material names looked up in the materials table for a configuration: anvils and gasket
+    return [a["material"] for a in seeDict["anvils"]] + [seeDict["gasketMaterial"]]
+
+def materialRow(db_engine, name):
+    #the columns of a material the result depends on, or None if it cannot be resolved
+    try:
+        mat = resolveMaterial(db_engine, name)
+    except ValueError:
+        return None
+    return {column: getattr(mat, column) for column in materialColumns}
+
+def configurationKey(seeDict, containerDict, wavelength, materialRows, tableHash):
+    #identical cells on the same grid with the same material data share one key and so one computation
+    #(hashed per part so validation stamps in the files do not change the key)
+    return contentHash({"see": contentHash(seeDict),
+                        "container": contentHash(containerDict) if containerDict is not None else None,
+                        "grid": gridHash(wavelength),
+                        "materials": materialRows,
+                        "crossSections": tableHash,
+                        "version": resultVersion})
+
+def computeConfiguration(seeDict, containerDict, wavelength, dbPath):
+    #attenuation contributions for one cell (and optional container) configuration.
+    #dictionaries with an intact validation stamp (files saved by SEEMetaSaver) are not re-validated
+
+    db_engine, attenuation = _workerEngines(dbPath)
+    oac = opposedAnvilCell.from_dict(seeDict, trusted=True)
+    wavelength = np.asarray(wavelength, dtype=float)
+
+    result = {
+        "wavelength": wavelength,
+        "loadAxis": np.asarray(oac.loadAxis, dtype=float),
+        "anvils": np.array([attenuation.attenuationSpectrum(resolveMaterial(db_engine, anv.material), wavelength)["values"]
+                            for anv in oac.anvils]),
+        "gasket": attenuation.attenuationSpectrum(resolveMaterial(db_engine, oac.gasketMaterial), wavelength)["values"]
+    }
+
+    if containerDict is not None:
+        container = cylinder.from_dict(containerDict, trusted=True)
+        mu = attenuation.linearAttenuation(container.chemicalFormula, container.massDensity, wavelength)
+        wall = (container.OD - container.ID) / 2 / 10 # mm to cm
+        result["container"] = mu
+        result["containerTransmission"] = np.exp(-mu * wall)
+
+    return result
+
+def _computeJob(job):
+    key, seeDict, containerDict, wavelength, dbPath = job
+    return key, computeConfiguration(seeDict, containerDict, wavelength, dbPath)
+
+def _cachePath(cacheDirectory, key):
+    return os.path.join(cacheDirectory, f"{key}.npz")
+
+def _loadCached(cacheDirectory, key):
+    filePath = _cachePath(cacheDirectory, key)
+    if not os.path.isfile(filePath):
+        return None
+    with np.load(filePath) as data:
+        return {name: data[name] for name in data.files}
+
+def _saveCached(cacheDirectory, key, result):
+    #write then rename, so concurrent campaigns sharing the directory never read a partial file
+    filePath = _cachePath(cacheDirectory, key)
+    tmpPath = f"{filePath}.{os.getpid()}.tmp.npz"
+    np.savez(tmpPath, **result)
+    os.replace(tmpPath, filePath)
+
+def runBatch(runs, wavelength, dbPath, cacheDirectory, processes=None):
+    #runs: list of {"run": run id, "see": opposedAnvilCell JSON path or dict,
+    #               "container": optional cylinder JSON path or dict}
+    #returns ({run id: result dictionary} (see top of module), {run id: error message}) -
+    #a failing configuration only fails its own runs, everything else is still computed and cached
+
+    os.makedirs(cacheDirectory, exist_ok=True)
+    wavelength = np.asarray(wavelength, dtype=float)
+    db_engine, attenuation = _workerEngines(dbPath)
+
+    rows = {}
+    def rowsFor(seeDict):
+        names = configurationMaterials(seeDict)
+        for name in names:
+            if name not in rows:
+                rows[name] = materialRow(db_engine, name)
+        return {name: rows[name] for name in names}
+
+    loaded = {}
+    def load(source):
+        if source is None or isinstance(source, dict):
+            return source
+        if source not in loaded:
+            loaded[source] = SEEMetaLoader(source)
+        return loaded[source]
+
+    runKeys = {}
+    unique = {}
+    for run in runs:
+        seeDict = load(run["see"])
+        containerDict = load(run.get("container"))
+        key = configurationKey(seeDict, containerDict, wavelength,
+                               rowsFor(seeDict), attenuation.tableHash)
+        runKeys[run["run"]] = key
+        unique.setdefault(key, (seeDict, containerDict))
+
+    results = {}
+    jobs = []
+    for key, (seeDict, containerDict) in unique.items():
+        cached = _loadCached(cacheDirectory, key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            jobs.append((key, seeDict, containerDict, wavelength, dbPath))
+
+    print(f"{len(runs)} runs, {len(unique)} unique configurations, {len(jobs)} to compute")
+
+    errors = {}
+    def collect(key, compute):
+        #cache each result as soon as it arrives, so one failure does not lose the others
+        try:
+            _, result = compute()
+        except Exception as e:
+            errors[key] = f"{type(e).__name__}: {e}"
+            return
+        _saveCached(cacheDirectory, key, result)
+        results[key] = result
+
+    if len(jobs) == 1 or processes == 1:
+        for job in jobs:
+            collect(job[0], lambda: _computeJob(job))
+    elif jobs:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {pool.submit(_computeJob, job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    if errors:
+        print(f"{len(errors)} configurations failed")
+
+    return ({run: results[key] for run, key in runKeys.items() if key in results},
+            {run: errors[key] for run, key in runKeys.items() if key in errors})
@@ -0,0 +1,102 @@
+# geometry consistency checks for SEE components
+#
+# The sample volume of an opposedAnvilCell is modelled as a cylinder around its
+# loadAxis, centred on the origin, with the diameter of the smaller anvil culet
+# and (optionally) a maximum height between the anvils. A cylinder container is
+# compatible with a cell if
+#   - its axis is parallel to the cell's loadAxis
+#   - its outer wall, offset by its center, stays within the culet radius
+#   - its axial extent stays within half the maximum sample height either side
+#     of the origin (only checked when a maximum height is given)
+#
+# All checks are numpy expressions over stacked component arrays, so a whole
+# catalog of candidate configurations is screened in one batch. Lengths in mm.
+
+import numpy as np
+
+def normalizeAxis(axis):
+    #unit vector(s) along axis; axis may be a single 3-vector or an (..., 3) array
+    axis = np.asarray(axis, dtype=float)
+    norm = np.linalg.norm(axis, axis=-1, keepdims=True)
+    if np.any(norm == 0):
+        raise ValueError("Cannot normalize a zero length axis")
+    return axis / norm
+
+def axesParallel(a, b, tolerance=1e-6):
+    #True where axes a and b are parallel or anti-parallel to within tolerance (radians)
+    cosine = np.abs(np.sum(normalizeAxis(a) * normalizeAxis(b), axis=-1))
+    return cosine >= np.cos(tolerance)
+
+def cellEnvelope(cells):
+    #(unit loadAxis (N,3), sample radius (N,)) for a list of opposedAnvilCells
+    loadAxis = normalizeAxis([cell.loadAxis for cell in cells])
+    radius = np.array([min(anv.culetDiameter for anv in cell.anvils) for cell in cells]) / 2
+    return loadAxis, radius
+
+def cylinderEnvelope(containers):
+    #(unit axis (M,3), center (M,3), ID (M,), OD (M,), height (M,)) for a list of cylinders
+    axis = normalizeAxis([c.axis for c in containers])
+    center = np.array([c.center for c in containers], dtype=float).reshape(-1, 3)
+    ID = np.array([c.ID for c in containers], dtype=float)
+    OD = np.array([c.OD for c in containers], dtype=float)
+    height = np.array([c.height for c in containers], dtype=float)
+    return axis, center, ID, OD, height
+
+def checkArrays(loadAxis, sampleRadius, axis, center, ID, OD, height, maxSampleHeight=None, tolerance=1e-6):
+    #core checks on broadcastable arrays (vectors carry a trailing dimension of 3).
+    #returns a dictionary of arrays, "ok" being the combination of all checks
+
+    loadAxis = normalizeAxis(loadAxis)
+    axis = normalizeAxis(axis)
+    center = np.asarray(center, dtype=float)
+    sampleRadius = np.asarray(sampleRadius, dtype=float)
+
+    axial = np.sum(center * loadAxis, axis=-1)
+    radialOffset = np.linalg.norm(center - axial[..., None] * loadAxis, axis=-1)
+    radialClearance = sampleRadius - (radialOffset + np.asarray(OD) / 2)
+
+    result = {
+        "axisParallel": axesParallel(loadAxis, axis, tolerance),
+        "wallValid": (np.asarray(ID) >= 0) & (np.asarray(ID) <= np.asarray(OD)),
+        "radialClearance": radialClearance,
+        "radialFit": radialClearance >= 0
+    }
+    if maxSampleHeight is not None:
+        axialClearance = np.asarray(maxSampleHeight, dtype=float) / 2 - (np.abs(axial) + np.asarray(height) / 2)
+        result["axialClearance"] = axialClearance
+        result["heightFit"] = axialClearance >= 0
+
+    ok = result["axisParallel"] & result["wallValid"] & result["radialFit"]
+    if maxSampleHeight is not None:
+        ok = ok & result["heightFit"]
+    result["ok"] = ok
+    return result
+
+def checkPairs(cells, containers, maxSampleHeight=None, tolerance=1e-6):
+    #checks for cells[i] holding containers[i]; every array in the result has length N
+    assert len(cells) == len(containers), "cells and containers must have the same length"
+    loadAxis, radius = cellEnvelope(cells)
+    return checkArrays(loadAxis, radius, *cylinderEnvelope(containers),
+                       maxSampleHeight=maxSampleHeight, tolerance=tolerance)
+
+def screenCombinations(cells, containers, maxSampleHeight=None, tolerance=1e-6):
+    #checks for every cell against every container; every array in the result is (N, M)
+    loadAxis, radius = cellEnvelope(cells)
+    axis, center, ID, OD, height = cylinderEnvelope(containers)
+    return checkArrays(loadAxis[:, None, :], radius[:, None], axis[None], center[None],
+                       ID[None], OD[None], height[None], maxSampleHeight=maxSampleHeight, tolerance=tolerance)
+
+def screenCatalog(objects, maxSampleHeight=None, tolerance=1e-6):
+    #screen every opposedAnvilCell against every cylinder in a catalog (e.g. an SEECatalog).
+    #returns (cell stringDescriptors, container stringDescriptors, screenCombinations result)
+    cells = []
+    containers = []
+    for obj in objects:
+        if hasattr(obj, "loadAxis"):
+            cells.append(obj)
+        elif hasattr(obj, "OD"):
+            containers.append(obj)
+    result = screenCombinations(cells, containers, maxSampleHeight, tolerance) if cells and containers else {}
+    return ([cell.stringDescriptor for cell in cells],
+            [container.stringDescriptor for container in containers],
+            result)
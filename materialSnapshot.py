@@ -0,0 +1,193 @@
+# read-only snapshot of the materials database
+#
+# Analysis nodes only ever read materials and spectra, so rather than shipping
+# materials.db and running SQL on every worker, the database can be exported to
+# a single versioned file that is memory-mapped on load. Every worker that opens
+# the same snapshot shares the same physical pages.
+#
+# File layout:
+#   8 bytes  magic (b"SEEMSNAP")
+#   4 bytes  format version (little endian uint32)
+#   8 bytes  header length in bytes (little endian uint64)
+#   header   utf-8 JSON: materials stored column-wise plus the spectra index
+#   padding  to an 8 byte boundary
+#   data     float64 little endian; each spectrum is wavelength then values
+#
+# usage:
+#   python materialSnapshot.py materials/materials.db materials/materials.snapshot
+
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import numpy as np
+
+snapshotMagic = b"SEEMSNAP"
+snapshotVersion = 1
+_preamble = struct.Struct("<8sIQ")
+
+def exportMaterialSnapshot(db_engine, filePath):
+    #write every material and its spectra arrays to a single snapshot file.
+    #SQL (and SEEmeta) are only imported here, so readers need just numpy and the standard library
+    from sqlalchemy import text
+    from SEEmeta import loadSpectrum
+
+    with db_engine.connect() as conn:
+        materialRows = conn.execute(text("SELECT * FROM materials ORDER BY id")).fetchall()
+        spectraRows = conn.execute(text("SELECT * FROM spectra ORDER BY id")).fetchall()
+
+    materialColumns = list(materialRows[0]._mapping.keys()) if materialRows else []
+    materials = {column: [row._mapping[column] for row in materialRows] for column in materialColumns}
+
+    spectra = []
+    blocks = []
+    offset = 0
+    for row in spectraRows:
+        spectrum = dict(row._mapping)
+        wavelength, values = loadSpectrum(spectrum)
+        block = np.concatenate([wavelength, values]).astype("<f8")
+        spectrum["offset"] = offset
+        spectrum["length"] = len(wavelength)
+        spectra.append(spectrum)
+        blocks.append(block)
+        offset += block.nbytes
+
+    header = json.dumps({
+        "version": snapshotVersion,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "source": str(db_engine.url),
+        "materials": materials,
+        "spectra": spectra
+    }, separators=(",",":")).encode("utf-8")
+    padding = -(_preamble.size + len(header)) % 8
+
+    #write to a temporary file first so readers never map a half written snapshot
+    tmpPath = f"{filePath}.tmp"
+    with open(tmpPath, "wb") as f:
+        f.write(_preamble.pack(snapshotMagic, snapshotVersion, len(header)))
+        f.write(header)
+        f.write(b"\0" * padding)
+        for block in blocks:
+            f.write(block.tobytes())
+    os.replace(tmpPath, filePath)
+
+    print(f"successfully wrote: {filePath}")
+
+class materialSnapshot:
+    #memory-mapped reader for a snapshot written by exportMaterialSnapshot
+
+    def __init__(self, filePath):
+        self.filePath = filePath
+        with open(filePath, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, headerLength = _preamble.unpack_from(self._mmap, 0)
+        if magic != snapshotMagic:
+            raise ValueError(f"{filePath} is not a materials snapshot")
+        if version != snapshotVersion:
+            raise ValueError(f"Unsupported snapshot version {version} in {filePath}, expected {snapshotVersion}")
+
+        headerStart = _preamble.size
+        header = json.loads(self._mmap[headerStart:headerStart + headerLength].decode("utf-8"))
+        self.version = header["version"]
+        self.created = header["created"]
+        self.source = header["source"]
+        #names this exact file, so caches keyed on its spectra go stale when it is re-exported
+        self.identity = f"snapshot:{os.path.abspath(filePath)}:{os.stat(filePath).st_mtime_ns}:{self.created}"
+        self._dataStart = headerStart + headerLength + (-(headerStart + headerLength) % 8)
+
+        self.columns = list(header["materials"].keys())
+        self.rows = [dict(zip(self.columns, values)) for values in zip(*header["materials"].values())]
+        self._byId = {row["id"]: row for row in self.rows}
+        self._byName = {}
+        for row in self.rows:
+            if row["name"] is not None:
+                self._byName.setdefault(row["name"].lower(), row)
+
+        self._spectra = {}
+        for spectrum in header["spectra"]:
+            self._spectra.setdefault(spectrum["material_id"], []).append(spectrum)
+
+    def find(self, *, id=None, name=None):
+        #returns the materials row matching id or (case insensitive) name
+        if id is not None:
+            row = self._byId.get(id)
+        else:
+            row = self._byName.get(name.lower())
+        if row is None:
+            raise ValueError(f"Material not found for id={id} name={name}")
+        return row
+
+    def spectra(self, material_id):
+        #spectra rows for a material, with zero-copy read-only arrays into the mapped file
+        result = []
+        for spectrum in self._spectra.get(material_id, []):
+            length = spectrum["length"]
+            data = np.frombuffer(self._mmap, dtype="<f8", count=2 * length,
+                                 offset=self._dataStart + spectrum["offset"])
+            row = {key: value for key, value in spectrum.items() if key not in ("offset", "length")}
+            row["wavelength"] = data[:length]
+            row["values"] = data[length:]
+            row["identity"] = f"{self.identity}:{spectrum['id']}"
+            result.append(row)
+        return result
+
+    def close(self):
+        #arrays returned by spectra() keep the mapping alive until they are released
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"<materialSnapshot {self.filePath} (version {self.version}, {len(self)} materials)>"
+
+class snapshotMaterial:
+    #same interface as SEEmeta.material, but backed by a materialSnapshot instead of SQL
+
+    def __init__(self, snapshot, *, id=None, name=None):
+        self.snapshot = snapshot
+
+        if id is None and name is None:
+            raise ValueError("Must provide either id or name.")
+
+        for key, value in snapshot.find(id=id, name=name).items():
+            setattr(self, key, value)
+
+        self.get_spectra()
+
+    def get_id(self):
+        return self.id
+
+    def __repr__(self):
+        return f"<Material {self.name} (ID: {self.id})>"
+
+    @classmethod
+    def load_all(cls, snapshot):
+        return [cls(snapshot, id=row["id"]) for row in snapshot.rows]
+
+    def get_spectra(self):
+        self.spectra = self.snapshot.spectra(self.id)
+        self.hasSpectra = len(self.spectra) > 0
+        return self.spectra
+
+if __name__ == "__main__":
+
+    if len(sys.argv) != 3:
+        print("usage: python materialSnapshot.py <materials.db> <output snapshot>")
+        sys.exit(1)
+
+    from sqlalchemy import create_engine
+    engine = create_engine(f"sqlite:///{os.path.abspath(sys.argv[1])}")
+    exportMaterialSnapshot(engine, sys.argv[2])
@@ -0,0 +1,125 @@
+# resampling of material spectra onto common wavelength grids
+#
+# Reduction runs evaluate the same spectra on the same few instrument grids over
+# and over, so each (spectrum, grid) interpolation is done once and kept in a
+# bounded LRU. The cache can be persisted to disk so later processes start warm.
+
+import json
+import os
+from collections import OrderedDict
+import numpy as np
+from SEEmeta import loadSpectrum, spectrumFilePath, gridHash
+
+def spectrumIdentity(spectrum):
+    #identifies a spectrum's data: rows from a snapshot or the attenuation engine carry an "identity",
+    #file-backed rows use resolved path and modification time, other in-memory rows a hash of the arrays
+    if "identity" in spectrum:
+        return spectrum["identity"]
+    if "wavelength" in spectrum and "values" in spectrum:
+        return f"data:{gridHash(spectrum['wavelength'])}:{gridHash(spectrum['values'])}"
+    filePath = spectrumFilePath(spectrum)
+    return f"file:{os.path.abspath(filePath)}:{os.stat(filePath).st_mtime_ns}"
+
+class spectrumResampler:
+    #interpolates spectra onto requested grids, caching results in an LRU bounded by
+    #maxEntries and (optionally) maxBytes. Points outside a spectrum's range are NaN.
+
+    def __init__(self, maxEntries=512, maxBytes=None, cacheFile=None):
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        self.cacheFile = cacheFile
+        self._cache = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._gridHashes = OrderedDict() # id(grid) -> (grid, copy of grid, hash) for recently used grid arrays
+
+        if cacheFile is not None and os.path.isfile(cacheFile):
+            self.load(cacheFile)
+
+    def resample(self, spectrum, wavelength):
+        wavelength = np.asarray(wavelength, dtype=float)
+        key = f"{spectrumIdentity(spectrum)}|{self.gridHash(wavelength)}"
+
+        if key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self.misses += 1
+        x, y = loadSpectrum(spectrum)
+        values = np.interp(wavelength, x, y, left=np.nan, right=np.nan)
+        self._store(key, values)
+        return values
+
+    def gridHash(self, wavelength):
+        #grid hash memoized per grid array. A copy of the grid is kept with its hash and compared on
+        #every hit (much cheaper than hashing), so a grid edited in place is hashed again
+        entry = self._gridHashes.get(id(wavelength))
+        if entry is not None and entry[0] is wavelength and np.array_equal(entry[1], wavelength):
+            self._gridHashes.move_to_end(id(wavelength))
+            return entry[2]
+        wavelengthHash = gridHash(wavelength)
+        self._gridHashes[id(wavelength)] = (wavelength, wavelength.copy(), wavelengthHash)
+        while len(self._gridHashes) > 64:
+            self._gridHashes.popitem(last=False)
+        return wavelengthHash
+
+    def resampleAll(self, spectra, wavelength):
+        #(nSpectra, nWavelength) array, e.g. for the rows returned by material.get_spectra()
+        wavelength = np.asarray(wavelength, dtype=float)
+        result = np.empty((len(spectra), len(wavelength)))
+        for i, spectrum in enumerate(spectra):
+            result[i] = self.resample(spectrum, wavelength)
+        return result
+
+    def _store(self, key, values):
+        values.flags.writeable = False
+        self._cache[key] = values
+        self.nbytes += values.nbytes
+        while len(self._cache) > self.maxEntries or (self.maxBytes is not None and self.nbytes > self.maxBytes):
+            _, evicted = self._cache.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self):
+        self._cache.clear()
+        self.nbytes = 0
+
+    def save(self, filePath=None):
+        #write the cache to an .npz file (keys in a JSON entry, arrays in LRU order)
+        filePath = filePath or self.cacheFile
+        if filePath is None:
+            raise ValueError("No cache file given.")
+        keys = list(self._cache.keys())
+        arrays = {f"entry{i}": self._cache[key] for i, key in enumerate(keys)}
+        tmpPath = f"{filePath}.tmp.npz"
+        np.savez(tmpPath, keys=np.array(json.dumps(keys)), **arrays)
+        os.replace(tmpPath, filePath)
+
+    def load(self, filePath=None):
+        #merge a saved cache into this one; entries for spectra files that have since changed
+        #are never hit again because their identity includes the modification time
+        filePath = filePath or self.cacheFile
+        with np.load(filePath) as data:
+            keys = json.loads(str(data["keys"]))
+            for i, key in enumerate(keys):
+                if key not in self._cache:
+                    self._store(key, data[f"entry{i}"].copy())
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __repr__(self):
+        stats = self.stats()
+        return (f"<spectrumResampler {stats['entries']} entries, {stats['nbytes']} bytes, "
+                f"hit rate {stats['hitRate']:.1%}>")
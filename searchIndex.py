@@ -0,0 +1,184 @@
+# in-memory search index for stringDescriptors and material names
+#
+# Prefix matching uses a trie holding every key from each "_"/" "/"-" token
+# boundary, so "cbn" finds "PE_VX5_CBN_single_toroid". Fuzzy matching goes
+# through a token index: each query token is matched by trigram similarity
+# against the (small) vocabulary of distinct tokens, and keys containing a
+# similar token for every query token are ranked by total similarity, so
+# "torroid cbn" still finds CBN toroids. Keys can be added and removed one at
+# a time as files are saved.
+
+import heapq
+import re
+from collections import OrderedDict
+
+_tokenBoundary = re.compile(r"[_\s\-]+")
+
+def _suffixes(key):
+    #lower case key from the start and from every token boundary
+    text = key.lower()
+    yield text
+    for match in _tokenBoundary.finditer(text):
+        if match.end() < len(text):
+            yield text[match.end():]
+
+def _tokens(text):
+    return {token for token in _tokenBoundary.split(text.lower()) if token}
+
+def _trigrams(token):
+    token = f"  {token} "
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+class searchIndex:
+    #prefix and fuzzy search over a set of keys, each with an optional payload
+
+    def __init__(self, keys=(), maxSimilar=1024):
+        self._trie = {}
+        self._postings = {}    # token -> keys containing it
+        self._keyTokens = {}
+        self._similar = OrderedDict() # LRU of similarTokens results, cleared when the vocabulary changes
+        self.maxSimilar = maxSimilar
+        self._vocabulary = {}  # trigram -> tokens containing it
+        self.payloads = {}
+        for key in keys:
+            self.add(key)
+
+    def clear(self):
+        self.__init__(maxSimilar=self.maxSimilar)
+
+    def add(self, key, payload=None):
+        if key in self.payloads:
+            self.payloads[key] = payload
+            return
+        self.payloads[key] = payload
+
+        for suffix in _suffixes(key):
+            node = self._trie
+            for char in suffix:
+                node = node.setdefault(char, {})
+            node.setdefault("", set()).add(key)
+
+        self._keyTokens[key] = _tokens(key)
+        for token in self._keyTokens[key]:
+            if token not in self._postings:
+                self._similar.clear()
+                self._postings[token] = set()
+                for gram in _trigrams(token):
+                    self._vocabulary.setdefault(gram, set()).add(token)
+            self._postings[token].add(key)
+
+    def remove(self, key):
+        if key not in self.payloads:
+            return
+        del self.payloads[key]
+
+        for suffix in _suffixes(key):
+            path = [self._trie]
+            for char in suffix:
+                path.append(path[-1][char])
+            path[-1][""].discard(key)
+            #prune branches left empty
+            for depth in range(len(suffix), 0, -1):
+                node = path[depth]
+                if node.get("") == set():
+                    del node[""]
+                if node:
+                    break
+                del path[depth - 1][suffix[depth - 1]]
+
+        for token in self._keyTokens.pop(key):
+            keys = self._postings[token]
+            keys.discard(key)
+            if not keys:
+                self._similar.clear()
+                del self._postings[token]
+                for gram in _trigrams(token):
+                    self._vocabulary[gram].discard(token)
+                    if not self._vocabulary[gram]:
+                        del self._vocabulary[gram]
+
+    def prefix(self, query, limit=10):
+        #keys with a token starting with query, in alphabetical order of the matched text
+        node = self._trie
+        for char in query.lower():
+            node = node.get(char)
+            if node is None:
+                return []
+
+        results = []
+        stack = [node]
+        while stack and len(results) < limit:
+            node = stack.pop()
+            for key in sorted(node.get("", ())):
+                if key not in results:
+                    results.append(key)
+            stack.extend(node[char] for char in sorted((c for c in node if c), reverse=True))
+        return results[:limit]
+
+    def similarTokens(self, token, threshold=0.3):
+        #{vocabulary token: trigram Jaccard similarity} for tokens at least threshold similar
+        #(cached, as autocomplete asks for the same leading tokens on every keystroke; the cache
+        #holds at most maxSimilar queries so a long-running server does not keep every token typed)
+        if (token, threshold) in self._similar:
+            self._similar.move_to_end((token, threshold))
+            return self._similar[(token, threshold)]
+        grams = _trigrams(token)
+        overlap = {}
+        for gram in grams:
+            for candidate in self._vocabulary.get(gram, ()):
+                overlap[candidate] = overlap.get(candidate, 0) + 1
+        similar = {}
+        for candidate, count in overlap.items():
+            score = count / (len(grams) + len(candidate) + 1 - count) # a token of n chars has n+1 trigrams
+            if score >= threshold:
+                similar[candidate] = score
+        self._similar[(token, threshold)] = similar
+        while len(self._similar) > self.maxSimilar:
+            self._similar.popitem(last=False)
+        return similar
+
+    def fuzzy(self, query, limit=10):
+        #keys with a similar token for every query token, best total similarity first.
+        #query tokens with no similar token at all are ignored.
+        groups = [similar for similar in map(self.similarTokens, _tokens(query)) if similar]
+        if not groups:
+            return []
+
+        if len(groups) == 1:
+            #single token: take keys token by token, most similar first
+            results = []
+            for token, _ in sorted(groups[0].items(), key=lambda item: (-item[1], item[0])):
+                results += heapq.nsmallest(limit - len(results), self._postings[token] - set(results))
+                if len(results) >= limit:
+                    break
+            return results
+
+        #keys holding the most similar token for every query token are the best matches
+        best = set.intersection(*(self._postings[max(similar, key=similar.get)] for similar in groups))
+        if len(best) >= limit:
+            return heapq.nsmallest(limit, best)
+
+        #otherwise score every key that has some similar token for each query token
+        candidates = set.intersection(*(set().union(*(self._postings[token] for token in similar))
+                                        for similar in groups))
+        ranked = []
+        for key in candidates:
+            keyTokens = self._keyTokens[key]
+            score = sum(max(similar.get(token, 0.0) for token in keyTokens) for similar in groups)
+            ranked.append((-score, key))
+        return [key for _, key in heapq.nsmallest(limit, ranked)]
+
+    def search(self, query, limit=10):
+        #prefix matches first, then the best fuzzy matches
+        if not query:
+            return heapq.nsmallest(limit, self.payloads)
+        results = self.prefix(query, limit)
+        if len(results) < limit:
+            results += [key for key in self.fuzzy(query, limit) if key not in results][:limit - len(results)]
+        return results
+
+    def __contains__(self, key):
+        return key in self.payloads
+
+    def __len__(self):
+        return len(self.payloads)
@@ -1,5 +1,7 @@
 import sys
 import os
+import json
+import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 def test_instantiateCylinder():
@@ -13,3 +15,184 @@ def test_instantiateCylinder():
                         ID=5.0,
                         OD=10.0,
                         height=20.0)
+
+def test_contentHashTracksChanges(tmp_path):
+
+    from SEEmeta import opposedAnvilCell, SEEMetaLoader, SEEMetaSaver, diffSEE, contentHash
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    data = SEEMetaLoader(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json"))
+    oac = opposedAnvilCell.from_dict(data)
+    other = opposedAnvilCell.from_dict(data)
+    assert oac.contentHash() == other.contentHash()
+    assert diffSEE(oac, other) == {}
+
+    filePath = str(tmp_path / "oac.json")
+    assert SEEMetaSaver(oac, filePath)
+    assert not SEEMetaSaver(oac, filePath)
+
+    oac.loadAxis[2] = 1
+    assert oac.contentHash() != other.contentHash()
+    oac.loadAxis[2] = 0
+    assert oac.contentHash() == other.contentHash()
+
+    #1 == 1.0, but the two serialize (and so hash) differently
+    oac.loadAxis = [float(element) if type(element) is int else int(element) for element in oac.loadAxis]
+    assert oac.contentHash() == contentHash(oac.to_dict())
+    assert oac.contentHash() != other.contentHash()
+    oac.loadAxis = list(other.loadAxis)
+
+    oac.anvils[0].comment = "chipped"
+    assert oac.contentHash() != other.contentHash()
+    assert diffSEE(other, oac) == {"anvils[0].comment": ("", "chipped")}
+    assert SEEMetaSaver(oac, filePath)
+
+def test_catalogRoundTrip(tmp_path):
+
+    from SEEmeta import anvil, opposedAnvilCell, SEEMetaLoader, SEECatalogSaver, SEECatalog
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    oacFiles = ["PE_VX5_CBN_single_toroid.json", "PE_VX3_ZTA_single_toroid.json", "DAC_MARK-VII_1.0mm_culet_Re_gasket.json"]
+    objects = [opposedAnvilCell.from_dict(SEEMetaLoader(os.path.join(repoDir, f))) for f in oacFiles]
+    objects.append(anvil.from_dict(SEEMetaLoader(os.path.join(repoDir, "anvils", "anvil_SXL_diamond_culet_1.0.json"))))
+
+    catalogFile = str(tmp_path / "catalog.jsonl")
+    SEECatalogSaver(objects, catalogFile)
+
+    catalog = SEECatalog(catalogFile)
+    assert [obj.contentHash() for obj in catalog] == [obj.contentHash() for obj in objects]
+    assert len(catalog) == 4
+    fetched = catalog["PE_VX3_ZTA_single_toroid"]
+    assert type(fetched) is opposedAnvilCell
+    assert fetched.contentHash() == objects[1].contentHash()
+
+    os.remove(catalogFile + ".idx")
+    assert type(SEECatalog(catalogFile)["anvil_SXL_diamond_culet_1.0"]) is anvil
+
+def test_trustedLoadingNeedsMatchingStamp(tmp_path):
+
+    from SEEmeta import opposedAnvilCell, SEEMetaLoader, SEEMetaSaver, SEEObjectLoader, stampValid
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    oac = opposedAnvilCell.from_dict(SEEMetaLoader(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json")))
+    assert stampValid(oac.toJSON().encode("utf-8"))
+    assert stampValid(oac.toJSON(indent=2).encode("utf-8"))
+
+    # an unstamped copy of an unchanged file still gets written, so it becomes trusted
+    filePath = str(tmp_path / "oac.json")
+    with open(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json")) as src, open(filePath, "w") as dst:
+        dst.write(src.read())
+    assert SEEMetaSaver(oac, filePath, indent=2)
+    assert not SEEMetaSaver(oac, filePath, indent=2)
+    assert SEEObjectLoader(filePath, trusted=True).contentHash() == oac.contentHash()
+
+    # edited content no longer matches its stamp, so trusted loading still validates it
+    with open(filePath) as f:
+        text = f.read()
+    with open(filePath, "w") as f:
+        f.write(text.replace('"TiZr"', '"unobtainium"'))
+    with open(filePath, "rb") as f:
+        assert not stampValid(f.read())
+    with pytest.raises(AssertionError):
+        SEEObjectLoader(filePath, trusted=True)
+
+def test_trustedFromDictChecksStamp(tmp_path):
+
+    from SEEmeta import opposedAnvilCell, cylinder, SEEMetaLoader, SEEMetaSaver, dictStampValid
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    filePath = str(tmp_path / "oac.json")
+    SEEMetaSaver(opposedAnvilCell.from_dict(SEEMetaLoader(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json"))),
+                 filePath, indent=2)
+    data = SEEMetaLoader(filePath)
+    assert dictStampValid(data)
+    assert opposedAnvilCell.from_dict(data, trusted=True).gasketMaterial == "TiZr"
+
+    # unstamped or edited dictionaries are always validated
+    with pytest.raises(AssertionError):
+        opposedAnvilCell.from_dict(dict(data, gasketMaterial="junk"), trusted=True)
+    unstamped = {key: value for key, value in data.items() if key != "validationStamp"}
+    with pytest.raises(AssertionError):
+        opposedAnvilCell.from_dict(dict(unstamped, gasketMaterial="junk"), trusted=True)
+
+    cyl = cylinder(material="V", chemicalFormula="V", massDensity=6.1, ID=4.0, OD=5.0, height=6.0,
+                   axis=[0.0,1.0,0.0], center=[0.0,0.0,0.0])
+    assert dictStampValid(json.loads(cyl.toJSON()))
+
+def test_onlyValidContentIsStamped(tmp_path):
+
+    from SEEmeta import opposedAnvilCell, SEEMetaLoader, SEEMetaSaver, SEECatalogSaver
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    data = SEEMetaLoader(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json"))
+    filePath = str(tmp_path / "oac.json")
+    catalogFile = str(tmp_path / "catalog.jsonl")
+
+    for field, value in [("gasketMaterial", "unobtainium"), ("temperatureControl", "furnace")]:
+        oac = opposedAnvilCell.from_dict(data)
+        setattr(oac, field, value)
+        with pytest.raises(AssertionError):
+            SEEMetaSaver(oac, filePath)
+        with pytest.raises(AssertionError):
+            SEECatalogSaver([oac], catalogFile)
+
+    # anvils and objects built without validation are checked too
+    oac = opposedAnvilCell.from_dict(data)
+    oac.anvils[0].material = "cheese"
+    with pytest.raises(AssertionError):
+        oac.toJSON()
+    with pytest.raises(AssertionError):
+        opposedAnvilCell._build(dict(data, gasketType="tape"), True).toJSON()
+    with pytest.raises(AssertionError):
+        SEECatalogSaver([dict(data, gasketType="tape")], catalogFile)
+    assert not os.path.exists(filePath) and not os.path.exists(catalogFile)
+
+def test_catalogRejectsDuplicatesAndReadsReadOnly(tmp_path, monkeypatch):
+
+    import SEEmeta
+    from SEEmeta import anvil, SEEMetaLoader, SEECatalogSaver, SEECatalog
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    anv = anvil.from_dict(SEEMetaLoader(os.path.join(repoDir, "anvils", "anvil_SXL_diamond_culet_1.0.json")))
+
+    catalogFile = str(tmp_path / "catalog.jsonl")
+    with pytest.raises(ValueError):
+        SEECatalogSaver([anv, anv], catalogFile)
+    assert not os.path.exists(catalogFile)
+
+    SEECatalogSaver([anv], catalogFile)
+    os.remove(catalogFile + ".idx")
+
+    # simulate a catalog directory the reader cannot write to
+    def readOnly(filePath, offsets, stamp=None):
+        raise PermissionError(filePath)
+    monkeypatch.setattr(SEEmeta, "_saveCatalogIndex", readOnly)
+    catalog = SEECatalog(catalogFile)
+    assert catalog["anvil_SXL_diamond_culet_1.0"].contentHash() == anv.contentHash()
+    assert not os.path.exists(catalogFile + ".idx")
+
+def test_trustedCatalogNeedsIntactStamp(tmp_path):
+
+    from SEEmeta import opposedAnvilCell, SEEMetaLoader, SEECatalogSaver, SEECatalog
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    oac = opposedAnvilCell.from_dict(SEEMetaLoader(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json")))
+    catalogFile = str(tmp_path / "catalog.jsonl")
+    SEECatalogSaver([oac], catalogFile)
+    assert SEECatalog(catalogFile, trusted=True).verified()
+
+    #a copy that does not preserve mtimes rebuilds the index but keeps the stamp
+    stat = os.stat(catalogFile)
+    os.utime(catalogFile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert SEECatalog(catalogFile, trusted=True).verified()
+    os.utime(catalogFile, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert SEECatalog(catalogFile, trusted=True).verified()
+
+    with open(catalogFile) as f:
+        text = f.read()
+    with open(catalogFile, "w") as f:
+        f.write(text.replace('"TiZr"', '"TiZR"'))
+    catalog = SEECatalog(catalogFile, trusted=True)
+    assert not catalog.verified()
+    with pytest.raises(AssertionError):
+        list(catalog)
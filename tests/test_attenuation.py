@@ -0,0 +1,34 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_parseChemicalFormula():
+
+    from attenuation import parseChemicalFormula
+
+    assert parseChemicalFormula("Zr0.32-Ti0.68") == [("Zr", 0.32), ("Ti", 0.68)]
+    assert parseChemicalFormula("(Li7)2-H-D2") == [("Li7", 2.0), ("H", 1.0), ("D", 2.0)]
+
+def test_attenuationIsLinearInWavelength():
+
+    import numpy as np
+    from attenuation import attenuationEngine
+
+    engine = attenuationEngine(maxEntries=2)
+    wavelength = np.array([0.0, 1.798, 3.596])
+    mu = engine.linearAttenuation("V", 6.1, wavelength)
+    # vanadium: 5.1 barn scattering, 5.08 barn absorption at 1.798 A
+    numberDensity = 6.1 * 6.02214076e23 / 50.942
+    assert np.allclose(mu, numberDensity * 1e-24 * np.array([5.1, 5.1 + 5.08, 5.1 + 2 * 5.08]))
+
+    class row:
+        def __init__(self, id, chemical_formula):
+            self.id = id
+            self.chemical_formula = chemical_formula
+            self.composition_by_weight_percent = None
+            self.mass_density_g_cm3 = 6.1
+
+    result = engine.attenuationAll([row(1, "V"), row(2, None), row(3, "V0.94-Nb0.06")], wavelength)
+    assert np.allclose(result[0], mu)
+    assert np.isnan(result[1]).all()
+    assert len(engine) == 2
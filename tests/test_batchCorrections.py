@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_runBatchGroupsIdenticalCells(tmp_path):
+
+    import numpy as np
+    from batchCorrections import runBatch
+
+    repoDir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    dbPath = os.path.join(repoDir, "materials", "materials.db")
+    pe = os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json")
+    dac = os.path.join(repoDir, "DAC_MARK-VII_1.0mm_culet_Re_gasket.json")
+    container = {"material": "V", "chemicalFormula": "V", "massDensity": 6.1,
+                 "ID": 5.0, "OD": 6.0, "height": 10.0}
+    runs = [{"run": n, "see": pe if n % 2 else dac} for n in range(10)]
+    runs.append({"run": 10, "see": pe, "container": container})
+    wavelength = np.linspace(0.5, 3.0, 11)
+    cacheDirectory = str(tmp_path / "cache")
+
+    results, failures = runBatch(runs, wavelength, dbPath, cacheDirectory, processes=2)
+    assert failures == {}
+    assert len(os.listdir(cacheDirectory)) == 3
+    assert results[1] is results[3]
+    assert results[0]["anvils"].shape == (2, 11)
+    assert np.all(results[10]["containerTransmission"] < 1.0)
+
+    # the container curve follows the cylinder's own formula and density
+    from attenuation import attenuationEngine
+    expected = attenuationEngine().linearAttenuation("V", 6.1, wavelength)
+    assert np.allclose(results[10]["container"], expected)
+
+    again, _ = runBatch(runs, wavelength, dbPath, cacheDirectory)
+    assert np.array_equal(again[0]["gasket"], results[0]["gasket"])
+
+def test_runBatchKeepsResultsWhenOneConfigurationFails(tmp_path):
+
+    import numpy as np
+    from batchCorrections import runBatch
+
+    repoDir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    dbPath = os.path.join(repoDir, "materials", "materials.db")
+    pe = os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json")
+    dac = os.path.join(repoDir, "DAC_MARK-VII_1.0mm_culet_Re_gasket.json")
+    # Tc is a valid element but has no entry in the cross-section table, so no curve can be computed
+    container = {"material": "V", "chemicalFormula": "Tc", "massDensity": 11.5,
+                 "ID": 5.0, "OD": 6.0, "height": 10.0}
+    # TiAlV is not in the materials table with a density, but the cylinder specifies its own
+    titanium = {"material": "TiAlV", "chemicalFormula": "Ti", "massDensity": 4.4,
+                "ID": 5.0, "OD": 6.0, "height": 10.0}
+    runs = [{"run": 1, "see": pe}, {"run": 2, "see": dac}, {"run": 3, "see": pe, "container": container},
+            {"run": 4, "see": pe, "container": titanium}]
+    cacheDirectory = str(tmp_path / "cache")
+
+    results, failures = runBatch(runs, np.linspace(0.5, 3.0, 11), str(dbPath), cacheDirectory, processes=2)
+    assert sorted(results) == [1, 2, 4]
+    assert list(failures) == [3]
+    assert len(os.listdir(cacheDirectory)) == 3
+
+def test_configurationKeyCoversMaterialData():
+
+    import numpy as np
+    from SEEmeta import SEEMetaLoader
+    from batchCorrections import configurationKey
+
+    repoDir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    see = SEEMetaLoader(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json"))
+    grid = np.linspace(0.5, 3.0, 11)
+    rows = {"CBN": {"name": "cBN", "chemical_formula": "B1-N1",
+                    "composition_by_weight_percent": None, "mass_density_g_cm3": 3.45}}
+    corrected = {"CBN": dict(rows["CBN"], mass_density_g_cm3=3.48)}
+
+    assert configurationKey(see, None, grid, rows, "table") != configurationKey(see, None, grid, corrected, "table")
+    assert configurationKey(see, None, grid, rows, "table") != configurationKey(see, None, grid, rows, "newTable")
@@ -0,0 +1,35 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_normalizeAndCompareAxes():
+
+    import numpy as np
+    import pytest
+    from geometry import normalizeAxis, axesParallel
+
+    assert np.allclose(normalizeAxis([0, 2, 0]), [0, 1, 0])
+    assert axesParallel([[0, 1, 0], [0, 0, 1]], [0, -3, 0]).tolist() == [True, False]
+    with pytest.raises(ValueError):
+        normalizeAxis([0, 0, 0])
+
+def test_screenCombinations():
+
+    from SEEmeta import opposedAnvilCell, cylinder, SEEMetaLoader
+    from geometry import screenCombinations, checkPairs
+
+    repoDir = os.path.join(os.path.dirname(__file__), '..')
+    pe = opposedAnvilCell.from_dict(SEEMetaLoader(os.path.join(repoDir, "PE_VX5_CBN_single_toroid.json")))
+    dac = opposedAnvilCell.from_dict(SEEMetaLoader(os.path.join(repoDir, "DAC_MARK-VII_1.0mm_culet_Re_gasket.json")))
+    small = cylinder(material="V", chemicalFormula="V", massDensity=6.1, ID=4.0, OD=5.0, height=6.0,
+                     axis=[0.0, 1.0, 0.0], center=[0.0, 0.0, 0.0])
+    tilted = cylinder(material="V", chemicalFormula="V", massDensity=6.1, ID=4.0, OD=5.0, height=6.0,
+                      axis=[1.0, 0.0, 0.0], center=[0.0, 0.0, 0.0])
+
+    result = screenCombinations([pe, dac], [small, tilted], maxSampleHeight=8.0)
+    assert result["ok"].shape == (2, 2)
+    # the PE cell loads along y with a 15.55 mm culet; the DAC culet is only 1 mm
+    assert result["ok"].tolist() == [[True, False], [False, False]]
+    assert abs(result["radialClearance"][0, 0] - (15.55 - 5.0) / 2) < 1e-9
+
+    assert not checkPairs([pe], [small], maxSampleHeight=5.0)["heightFit"][0]
@@ -0,0 +1,32 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_snapshotRoundTrip(tmp_path):
+
+    from sqlalchemy import create_engine
+    from SEEmeta import material
+    from materialSnapshot import exportMaterialSnapshot, materialSnapshot, snapshotMaterial
+
+    dbFile = os.path.join(os.path.dirname(__file__), '..', 'materials', 'materials.db')
+    engine = create_engine(f"sqlite:///{os.path.abspath(dbFile)}")
+    snapshotFile = str(tmp_path / "materials.snapshot")
+    exportMaterialSnapshot(engine, snapshotFile)
+
+    with materialSnapshot(snapshotFile) as snapshot:
+        fromSQL = material(engine, name="zta")
+        fromSnapshot = snapshotMaterial(snapshot, name="zta")
+
+        assert fromSnapshot.id == fromSQL.id
+        assert fromSnapshot.mass_density_g_cm3 == fromSQL.mass_density_g_cm3
+        assert fromSnapshot.hasSpectra == fromSQL.hasSpectra
+        assert list(fromSnapshot.spectra[0]["wavelength"]) == [0.4, 0.5, 0.6, 0.7]
+        assert len(snapshotMaterial.load_all(snapshot)) == len(material.load_all(engine))
+
+def test_readerDoesNotNeedSQL():
+
+    import subprocess
+    repoDir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+    code = "import sys, materialSnapshot; print('sqlalchemy' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=repoDir, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
@@ -0,0 +1,61 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_resamplerCachesAndPersists(tmp_path):
+
+    import numpy as np
+    from resampling import spectrumResampler
+
+    spectrum = {"wavelength": np.array([0.4, 0.5, 0.6, 0.7]), "values": np.array([0.94, 0.76, 0.50, 0.77])}
+    grid = np.array([0.45, 0.55, 0.8])
+    cacheFile = str(tmp_path / "resampled.npz")
+
+    resampler = spectrumResampler(maxEntries=4, cacheFile=cacheFile)
+    first = resampler.resample(spectrum, grid)
+    assert np.allclose(first[:2], [0.85, 0.63])
+    assert np.isnan(first[2])
+    assert resampler.resample(spectrum, grid) is first
+    assert resampler.stats()["hitRate"] == 0.5
+    resampler.save()
+
+    warm = spectrumResampler(cacheFile=cacheFile)
+    assert np.array_equal(warm.resample(spectrum, grid), first, equal_nan=True)
+    assert warm.stats()["misses"] == 0
+
+def test_resamplerEvicts():
+
+    import numpy as np
+    from resampling import spectrumResampler
+
+    spectrum = {"wavelength": np.array([0.0, 1.0]), "values": np.array([0.0, 1.0])}
+    resampler = spectrumResampler(maxEntries=2)
+    for n in range(3, 6):
+        resampler.resample(spectrum, np.linspace(0, 1, n))
+    assert len(resampler) == 2
+    assert resampler.nbytes == (4 + 5) * 8
+
+def test_resamplerUsesRowIdentity():
+
+    import numpy as np
+    from resampling import spectrumResampler
+
+    # rows carrying an identity are keyed by it, not by hashing their arrays
+    first = {"identity": "snapshot:a:1", "wavelength": np.array([0.0, 1.0]), "values": np.array([0.0, 1.0])}
+    same = {"identity": "snapshot:a:1", "wavelength": np.array([0.0, 1.0]), "values": np.array([0.0, 1.0])}
+    grid = np.array([0.5])
+    resampler = spectrumResampler()
+    assert resampler.resample(first, grid) is resampler.resample(same, grid)
+    assert resampler.stats()["hits"] == 1
+
+def test_resamplerNoticesEditedGrid():
+
+    import numpy as np
+    from resampling import spectrumResampler
+
+    spectrum = {"wavelength": np.array([0.0, 1.0]), "values": np.array([0.0, 1.0])}
+    grid = np.array([0.2, 0.4])
+    resampler = spectrumResampler()
+    assert np.allclose(resampler.resample(spectrum, grid), [0.2, 0.4])
+    grid[:] = [0.6, 0.8]
+    assert np.allclose(resampler.resample(spectrum, grid), [0.6, 0.8])
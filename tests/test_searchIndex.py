@@ -0,0 +1,39 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def test_prefixAndFuzzySearch():
+
+    from searchIndex import searchIndex
+
+    index = searchIndex(["PE_VX5_CBN_single_toroid", "PE_VX3_ZTA_single_toroid",
+                         "DAC_MARK-VII_1.0mm_culet_Re_gasket", "anvil_SXL_diamond_culet_1.0"])
+
+    assert index.prefix("pe_vx") == ["PE_VX3_ZTA_single_toroid", "PE_VX5_CBN_single_toroid"]
+    assert index.prefix("cbn") == ["PE_VX5_CBN_single_toroid"]
+    assert index.fuzzy("torroid cbnn") == ["PE_VX5_CBN_single_toroid"]
+    assert index.search("diamnd culet")[0] == "anvil_SXL_diamond_culet_1.0"
+
+def test_incrementalUpdates():
+
+    from searchIndex import searchIndex
+
+    index = searchIndex()
+    index.add("anvil_single_toroid_standard_CBN", "anvil_single_toroid_standard_CBN.json")
+    index.add("anvil_single_toroid_standard_ZTA")
+    assert len(index.search("toroid")) == 2
+
+    index.remove("anvil_single_toroid_standard_CBN")
+    assert index.search("toroid") == ["anvil_single_toroid_standard_ZTA"]
+    assert index.prefix("cbn") == []
+    assert index.fuzzy("cbn") == []
+
+def test_similarTokenCacheIsBounded():
+
+    from searchIndex import searchIndex
+
+    index = searchIndex(["PE_VX5_CBN_single_toroid", "DAC_MARK-VII_1.0mm_culet_Re_gasket"], maxSimilar=3)
+    for query in ["toroid", "torroid", "cbn", "culet", "gaskit", "toroid"]:
+        index.search(query)
+    assert len(index._similar) == 3
+    assert index.fuzzy("torroid") == ["PE_VX5_CBN_single_toroid"]